@@ -1,14 +1,24 @@
 import os
 import sys
 import argparse
-from pathlib import Path
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-# Load environment variables from .env file
-from dotenv import load_dotenv
-load_dotenv(Path(__file__).parent / '.env')
-
-from rag_agent import rag_answer
+# Importing these is cheap: openai, ddgs, dotenv, etc. are only loaded once they are needed
+from rag_agent import rag_answer, rag_answer_batch, DEFAULT_SNIPPET_CHARS
 from evaluator import evaluate_response
+from rag_cache import DEFAULT_TTL
+from env_loader import load_env
+
+
+def positive_int(value: str) -> int:
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -19,17 +29,69 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument('--deepseek-key', default=None, help='Temporarily set DEEPSEEK_API_KEY for this run')
     p.add_argument('--evaluate', default = True, help='Run LLM-based evaluation of response quality')
     p.add_argument('--eval-model', default='deepseek-chat', help='DeepSeek model for evaluation')
+    p.add_argument('--no-cache', action='store_true', help='Ignore cached answers and do not store new ones')
+    p.add_argument('--cache-ttl', type=int, default=DEFAULT_TTL, help='Seconds a cached answer stays valid (default: 86400)')
+    p.add_argument('--semantic-cache', action='store_true', help='Reuse cached answers for similar queries (needs sentence-transformers, faiss-cpu)')
+    p.add_argument('--max-snippet-chars', type=int, default=DEFAULT_SNIPPET_CHARS, help='Truncate each search result description to this many characters (default: 280)')
+    p.add_argument('--batch-file', default=None, help='Answer every query in this file (one per line) concurrently; skips evaluation')
+    p.add_argument('--concurrency', type=positive_int, default=8, help='Maximum queries in flight with --batch-file (default: 8)')
     return p
 
 
+def print_sources(sources):
+    for i, s in enumerate(sources, start=1):
+        print(f"[{i}]", s.get('title'), '-', s.get('url'))
+
+
+def warm_up_llm():
+    from llm_client import warm_up
+    warm_up()
+
+
+def run_batch(args):
+    import asyncio
+
+    with open(args.batch_file, encoding='utf-8') as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    outs = asyncio.run(rag_answer_batch(
+        queries,
+        concurrency=args.concurrency,
+        max_results=args.max_results,
+        model=args.model,
+        use_cache=not args.no_cache,
+        cache_ttl=args.cache_ttl,
+        semantic_cache=args.semantic_cache,
+        max_snippet_chars=args.max_snippet_chars,
+    ))
+
+    for out in outs:
+        print(f"\n##### {out['query']}")
+        print('\n=== Generated Answer ===\n')
+        print(out['answer'])
+        print('\n=== Sources ===\n')
+        print_sources(out['sources'])
+
+
 def main(argv=None):
     argv = argv if argv is not None else sys.argv[1:]
     parser = build_parser()
     args = parser.parse_args(argv)
 
+    # Load environment variables from .env file
+    load_env()
+
     if args.deepseek_key:
         os.environ['DEEPSEEK_API_KEY'] = args.deepseek_key
 
+    if args.batch_file:
+        run_batch(args)
+        return
+
+    # Connect to DeepSeek in the background while the query is read and searched
+    if os.environ.get('DEEPSEEK_API_KEY'):
+        threading.Thread(target=warm_up_llm, daemon=True).start()
+
     if args.query:
         query = ' '.join(args.query)
     else:
@@ -37,32 +99,44 @@ def main(argv=None):
 
 
 
-    out = rag_answer(query, max_results=args.max_results, model=args.model)
-
+    # The answer is streamed to stdout while it is generated
     print('\n=== Generated Answer ===\n')
-    print(out['answer'])
-    print('\n=== Sources ===\n')
-    for i, s in enumerate(out['sources'], start=1):
-        print(f"[{i}]", s.get('title'), '-', s.get('url'))
+    out = rag_answer(query, max_results=args.max_results, model=args.model,
+                     use_cache=not args.no_cache, cache_ttl=args.cache_ttl,
+                     semantic_cache=args.semantic_cache, max_snippet_chars=args.max_snippet_chars,
+                     stream=True)
+    print()
+
+    # Start the evaluation call right away so it runs while the sources are printed
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        eval_future = None
+        if args.evaluate:
+            eval_future = executor.submit(
+                evaluate_response,
+                query,
+                out['answer'],
+                out['sources'],
+                sources_text=out.get('context'),
+                model=args.eval_model
+            )
+
+        print('\n=== Sources ===\n')
+        print_sources(out['sources'])
+
+        if eval_future is None:
+            return
 
-        
-    if args.evaluate:
         print('\n=== Evaluating Response ===\n')
-        eval_result = evaluate_response(
-            query, 
-            out['answer'], 
-            out['sources'],
-            model=args.eval_model
-        )
-        
-        print(f"Accuracy Score:      {eval_result['accuracy_score']}/10")
-        print(f"Relevance Score:     {eval_result['relevance_score']}/10")
-        print(f"Search Quality:     {eval_result['search_quality']}/10")
-        print(f"Citation Quality:    {eval_result['citation_quality']}/10")
-        print(f"Overall Score:       {eval_result['overall_score']}/10")
-        print(f"\nFeedback: {eval_result['feedback']}")
-        print(f"Strengths: {eval_result['strengths']}")
-        print(f"Opportunity: {eval_result['opportunity']}")
+        eval_result = eval_future.result()
+
+    print(f"Accuracy Score:      {eval_result.get('accuracy_score', 'n/a')}/10")
+    print(f"Relevance Score:     {eval_result.get('relevance_score', 'n/a')}/10")
+    print(f"Search Quality:     {eval_result.get('search_quality', 'n/a')}/10")
+    print(f"Citation Quality:    {eval_result.get('citation_quality', 'n/a')}/10")
+    print(f"Overall Score:       {eval_result['overall_score']}/10")
+    print(f"\nFeedback: {eval_result.get('feedback', '')}")
+    print(f"Strengths: {eval_result.get('strengths', '')}")
+    print(f"Opportunity: {eval_result.get('opportunity', '')}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,24 @@
+###Loads settings such as `DEEPSEEK_API_KEY` from the project's `.env` file.
+### `load_env() → None`
+
+# **Notes**:
+# - Safe to call from every entry point; the file is read only on the first call.
+# - Variables already set in the environment are not overridden.
+# - `dotenv` is imported on first call so importing this module stays cheap.
+##############################################################################
+
+import threading
+from pathlib import Path
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """Load environment variables from the .env file once, before the API key is read."""
+    global _loaded
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            load_dotenv(Path(__file__).parent / ".env")
+            _loaded = True
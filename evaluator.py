@@ -1,10 +1,12 @@
 ### Evaluates the quality and accuracy of a RAG-generated response.
-### `evaluate_response(query: str, answer: str, sources: list, model: str = "deepseek-chat") → Dict[str, Any]`
+### `evaluate_response(query: str, answer: str, sources: list, *, sources_text: Optional[str] = None, model: str = "deepseek-chat") → Dict[str, Any]`
 
 # **Parameters**:
 # - `query` (str): Original user query
 # - `answer` (str): Generated answer text
 # - `sources` (list): List of source dictionaries used in answer generation
+# - `sources_text` (str): Pre-rendered sources, e.g. the `context` returned by `rag_answer`,
+#   so the evaluator sees exactly what the generator saw (default: rendered from `sources`)
 # - `model` (str): DeepSeek model for evaluation (default: "deepseek-chat")
 
 # **Returns**: Dictionary with keys:
@@ -12,57 +14,36 @@
 # - `relevance_score` (0-10): How well answer addresses the query
 # - `search_quality` (0-10): Quality and completeness of search results
 # - `citation_quality` (0-10): Quality and appropriateness of source citations
-# - `overall_score` (0-10): Average of all three scores
+# - `overall_score` (0-10): Weighted average of the valid scores (see `WEIGHTS`)
 # - `feedback` (str): Explanation of scores
 # - `strengths` (str): What the response does well
 # - `weaknesses` (str): Areas for improvement
 # ############################################################################
 
+import io
 import os
-import json
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, Optional
 
-from openai import OpenAI
+import orjson
 
+from env_loader import load_env
 
-def evaluate_response(query: str, answer: str, sources: list, model: str = "deepseek-chat") -> Dict[str, Any]:
-    """
-    Evaluate the quality and accuracy of response using an LLM.
-    
-    Args:
-        query: Original user query
-        answer: Generated answer from RAG agent
-        sources: List of source dicts with 'title', 'url', 'description'
-        model: OpenAI model to use for evaluation
-    
-    Returns:
-        Dict with keys: 'accuracy_score' (0-10), 'relevance_score' (0-10), search_quality' (0-10),
-        'citation_quality' (0-10), 'feedback', 'overall_score' (0-10)
-    """
-    api_key = os.environ.get("DEEPSEEK_API_KEY")
-
-    if not api_key or OpenAI is None:
-        return _fallback_evaluation(query, answer, sources)
-
-    client = OpenAI(
-    api_key=os.environ.get("DEEPSEEK_API_KEY"),
-    base_url="https://api.deepseek.com/v1")   
-    
-    # Build source context for the evaluator
-    sources_text = "\n".join([
-        f"- {s.get('title', 'N/A')}: {s.get('url', 'N/A')}\n  {s.get('description', '')}"
-        for s in sources
-    ])
-    
-    eval_prompt = f"""You are an expert evaluator assessing agent's responses to query based on sources materials used.
-
-User Query: {query}
+logger = logging.getLogger(__name__)
 
-Generated Answer:
-{answer}
+# (score key, weight) pairs used for `overall_score`. The weights sum to 1.0; when some scores
+# are missing or invalid, the remaining ones are averaged over their own weights.
+WEIGHTS = (
+    ("accuracy_score", 0.3),
+    ("relevance_score", 0.3),
+    ("search_quality", 0.3),
+    ("citation_quality", 0.1),
+)
 
-Source Material Used:
-{sources_text}
+# Static evaluator instructions. Kept byte-identical across calls and sent as the first
+# message so DeepSeek's prefix cache can reuse it for every evaluation after the first.
+SYSTEM_RUBRIC = """You are an expert evaluator assessing agent's responses to query based on sources materials used.
+The user message contains the User Query, the Generated Answer and the Source Material Used.
 
 Evaluate the response on these criteria:
 1. **Accuracy (0-10)**: How factually correct and supported by sources is the answer?
@@ -72,7 +53,7 @@ Evaluate the response on these criteria:
 
 
 Respond in JSON format only with this exact structure (no markdown, no code blocks):
-{{
+{
   "accuracy_score": <int 0-10>,
   "relevance_score": <int 0-10>,
   "search_quality": <int 0-10>,
@@ -80,41 +61,119 @@ Respond in JSON format only with this exact structure (no markdown, no code bloc
   "feedback": "<brief explanation of scores>",
   "strengths": "<what the response does well>",
   "opportunity": "<what could be improved>"
-}}"""
+}"""
+
+EVAL_USER_TEMPLATE = "User Query: {query}\n\nGenerated Answer:\n{answer}\n\nSource Material Used:\n{sources_text}"
+SOURCE_TEMPLATE = "- {title}: {url}\n  {description}"
+
+
+def _render_sources(sources: list) -> str:
+    """Render the source list for the evaluator, one `SOURCE_TEMPLATE` entry per line."""
+    buf = io.StringIO()
+    for i, s in enumerate(sources):
+        if i:
+            buf.write("\n")
+        buf.write(SOURCE_TEMPLATE.format_map({
+            "title": s.get('title', 'N/A'),
+            "url": s.get('url', 'N/A'),
+            "description": s.get('description', ''),
+        }))
+    return buf.getvalue()
+
+
+def evaluate_response(query: str, answer: str, sources: list, *,
+                      sources_text: Optional[str] = None, model: str = "deepseek-chat") -> Dict[str, Any]:
+    """
+    Evaluate the quality and accuracy of response using an LLM.
+    
+    Args:
+        query: Original user query
+        answer: Generated answer from RAG agent
+        sources: List of source dicts with 'title', 'url', 'description'
+        sources_text: Already rendered sources to reuse instead of rendering `sources`
+        model: OpenAI model to use for evaluation
+    
+    Returns:
+        Dict with keys: 'accuracy_score' (0-10), 'relevance_score' (0-10), search_quality' (0-10),
+        'citation_quality' (0-10), 'feedback', 'overall_score' (0-10)
+    """
+    load_env()
+    api_key = os.environ.get("DEEPSEEK_API_KEY")
+
+    if not api_key:
+        return _fallback_evaluation(query, answer, sources)
+
+    # Deferred so that importing this module does not pull in openai/httpx
+    from openai import APIError
+    from llm_client import get_client
+
+    # Only the dynamic content goes in the user message; the rubric stays a fixed prefix
+    user_msg = EVAL_USER_TEMPLATE.format_map({
+        "query": query,
+        "answer": answer,
+        "sources_text": sources_text if sources_text is not None else _render_sources(sources),
+    })
 
     try:
-        resp = client.chat.completions.create(
+        resp = get_client().chat.completions.create(
             model=model,
-            messages=[{"role": "user", "content": eval_prompt}],
-            max_tokens=512,
-            temperature=1,
+            messages=[{"role": "system", "content": SYSTEM_RUBRIC}, {"role": "user", "content": user_msg}],
+            # The JSON reply is ~150 tokens; a low temperature keeps it stable
+            max_tokens=256,
+            temperature=0.2,
+            # JSON mode: the server guarantees a parseable JSON object
+            response_format={"type": "json_object"},
         )
-        eval_text = resp.choices[0].message.content.strip()
-        
-        # Parse JSON response
-        eval_dict = json.loads(eval_text)
-        
-        # Calculate overall score as average
-        overall = (eval_dict.get("accuracy_score", 5)*0.3+ 
-                   eval_dict.get("relevance_score", 5)*0.3+
-                   eval_dict.get("search_quality", 5)*0.3+ 
-                   eval_dict.get("citation_quality", 5)*0.1) 
-        eval_dict["overall_score"] = round(overall, 1)
-        
-        return eval_dict
-    
-    except (json.JSONDecodeError, KeyError, Exception) as e:
-        # Fallback if parsing fails
-        return {
-            "accuracy_score": 5,
-            "relevance_score": 5,
-            "citation_quality": 5,
-            "search_quality": 5,
-            "overall_score": 5.0,
-            "feedback": f"Evaluation failed: {str(e)}. Using neutral scores.",
-            "strengths": "Evaluation system error, unable to evaluate.",
-            "opportunity": "Evaluation system error, unable to evaluate."
-        }
+    except APIError as e:
+        return _neutral_evaluation(e)
+
+    eval_text = resp.choices[0].message.content or ""
+
+    # Parse JSON response
+    try:
+        eval_dict = orjson.loads(eval_text)
+    except orjson.JSONDecodeError as e:
+        return _neutral_evaluation(e)
+
+    # JSON mode guarantees valid JSON, not our schema: require an object and numeric scores
+    if not isinstance(eval_dict, dict):
+        return _neutral_evaluation(TypeError(f"expected a JSON object, got {type(eval_dict).__name__}"))
+    for k, _ in WEIGHTS:
+        if k in eval_dict and not _is_score(eval_dict[k]):
+            logger.warning("Evaluator returned a non-numeric %s: %r", k, eval_dict[k])
+            del eval_dict[k]
+
+    # Calculate overall score as a weighted average of the valid scores; flag missing
+    # (e.g. misspelled) keys instead of silently scoring them as 5
+    present = [(eval_dict[k], w) for k, w in WEIGHTS if _is_score(eval_dict.get(k))]
+    if not present:
+        return _neutral_evaluation(ValueError("no valid scores in evaluator response"))
+    if len(present) < len(WEIGHTS):
+        missing = [k for k, _ in WEIGHTS if not _is_score(eval_dict.get(k))]
+        logger.warning("Evaluator response is missing score keys: %s", ", ".join(missing))
+    overall = sum(v * w for v, w in present) / sum(w for _, w in present)
+    eval_dict["overall_score"] = round(overall, 1)
+
+    return eval_dict
+
+
+def _is_score(value: Any) -> bool:
+    # bool is a subclass of int, but true/false is not a score
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _neutral_evaluation(error: Exception) -> Dict[str, Any]:
+    """Neutral scores returned when the evaluation call or its JSON parsing fails."""
+    return {
+        "accuracy_score": 5,
+        "relevance_score": 5,
+        "citation_quality": 5,
+        "search_quality": 5,
+        "overall_score": 5.0,
+        "feedback": f"Evaluation failed: {str(error)}. Using neutral scores.",
+        "strengths": "Evaluation system error, unable to evaluate.",
+        "opportunity": "Evaluation system error, unable to evaluate."
+    }
 
 
 def _fallback_evaluation(query: str, answer: str, sources: list) -> Dict[str, Any]:
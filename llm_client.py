@@ -0,0 +1,69 @@
+###Shared DeepSeek API clients.
+### `get_client() → OpenAI`
+### `new_async_client() → AsyncOpenAI`
+### `warm_up() → None`
+
+# **Notes**:
+# - The sync client is created on first use and then reused for the life of the process, so
+#   the HTTP/2 connection and TLS session to the DeepSeek API are kept alive between calls
+#   instead of being set up again for every request.
+# - `new_async_client` returns a fresh client each call. httpx async connections are bound to
+#   the event loop that opened them, so use it as `async with new_async_client() as client:`
+#   around a whole batch; the pool is shared by the batch and closed when it ends.
+# - The API key is read from `DEEPSEEK_API_KEY` when the client is first created.
+# - Connection errors, timeouts, 408/409/429 and 5xx responses are retried by the SDK
+#   up to `MAX_RETRIES` times with exponential backoff, honoring `Retry-After`.
+# - `warm_up` opens the sync client's connection (DNS, TCP, TLS, HTTP/2) ahead of the first
+#   request; call it from a background thread while other work, such as the search, runs.
+##############################################################################
+
+import os
+import threading
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1"
+MAX_RETRIES = 4
+TIMEOUT = 30.0
+_LIMITS = httpx.Limits(max_keepalive_connections=20)
+
+_client = None
+_http_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> OpenAI:
+    """Return the shared DeepSeek client, creating it on first use."""
+    global _client, _http_client
+    # Locked because `warm_up` may create the client from another thread
+    with _client_lock:
+        if _client is None:
+            _http_client = httpx.Client(http2=True, limits=_LIMITS)
+            _client = OpenAI(
+                api_key=os.environ.get("DEEPSEEK_API_KEY"),
+                base_url=DEEPSEEK_BASE_URL,
+                max_retries=MAX_RETRIES,
+                timeout=TIMEOUT,
+                http_client=_http_client)
+    return _client
+
+
+def new_async_client() -> AsyncOpenAI:
+    """Create a DeepSeek async client; the caller closes it, ideally via `async with`."""
+    return AsyncOpenAI(
+        api_key=os.environ.get("DEEPSEEK_API_KEY"),
+        base_url=DEEPSEEK_BASE_URL,
+        max_retries=MAX_RETRIES,
+        timeout=TIMEOUT,
+        http_client=httpx.AsyncClient(http2=True, limits=_LIMITS))
+
+
+def warm_up() -> None:
+    """Establish the connection to the DeepSeek API so the first real request can reuse it."""
+    get_client()
+    try:
+        # Any response is fine; the point is to leave a live connection in the pool
+        _http_client.head(DEEPSEEK_BASE_URL, timeout=TIMEOUT)
+    except httpx.HTTPError:
+        pass
@@ -4,83 +4,279 @@
 #- `query` (str): Your question or search query
 #- `max_results` (int): Number of search results to retrieve (default: 10)
 #- `model` (str): model name (default: "deepseek-chat")
+#- `use_cache` (bool): Return a stored answer for a repeated query if available (default: True)
+#- `cache_ttl` (int): Seconds a generated answer stays cached (default: 86400)
+#- `semantic_cache` (bool): Also reuse answers of similar (paraphrased) queries (default: False)
+#- `max_snippet_chars` (int): Longest search-result description passed to the model (default: 280)
+#- `stream` (bool): Write the answer to stdout as it is generated (default: False)
+
+### `rag_answer_async(...)` takes the same parameters except `stream` and is awaitable.
+# It also accepts `client`, an `AsyncOpenAI` to reuse; without one it opens and closes its own.
+### `rag_answer_batch(queries: List[str], concurrency: int = 8, **kwargs) → List[Dict[str, Any]]`
+# Runs `rag_answer_async` for every query concurrently (at most `concurrency` at a time),
+# returning results in the same order as `queries`. `kwargs` are passed to `rag_answer_async`.
 
 # **Returns**: Dictionary with keys:
 # - `query`: The original query
 # - `answer`: Generated answer with citations
 # - `sources`: List of source dictionaries used
+# - `context`: The rendered search results exactly as sent to the model
 ##############################################################################
 
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
-from typing import List, Dict, Any
-from search_ddg import search_duckduckgo
+import sys
+import html
+from typing import List, Dict, Any, Optional
+from rag_cache import DEFAULT_TTL, cache_key, get_cached, set_cached, get_semantic, set_semantic
+from env_loader import load_env
+
+# openai, httpx, ddgs, dotenv and asyncio are imported inside the functions that use them so
+# that importing this module (e.g. for `cli.py --help` or a cache hit) stays fast.
+
+# Sent first and unchanged on every call so the provider's prefix cache can reuse it
+SYSTEM_PROMPT = (
+    "You are a helpful assistant. Answer the user's question using only the content in provided"
+    " webpages from search results. Cite sources by their number in square brackets, e.g. [1]."
+)
+USER_PROMPT_TEMPLATE = (
+    "Question: {query}\n\nSearch results:\n{context}\n\n"
+    "Answer concisely and list which sources you used at the end."
+)
+DOC_TEMPLATE = "[{index}] {title}\n{url}\n{description}"
+DEFAULT_SNIPPET_CHARS = 280
+
+
+def _cache_lookup(key: str, query: str, params: tuple,
+                  semantic_cache: bool) -> Optional[Dict[str, Any]]:
+    """Return a cached result for the query, trying the exact key before the semantic index."""
+    cached = get_cached(key)
+    if cached is not None:
+        # The key is case-insensitive, so report the query as this caller typed it
+        return {**cached, "query": query}
+    if semantic_cache:
+        return get_semantic(query, *params)
+    return None
+
+
+def _cache_store(key: str, result: Dict[str, Any], params: tuple,
+                 cache_ttl: int, semantic_cache: bool) -> None:
+    """Store a generated result in the exact-match cache and, if enabled, the semantic index."""
+    set_cached(key, result, ttl=cache_ttl)
+    if semantic_cache:
+        set_semantic(result["query"], key, *params, ttl=cache_ttl)
+
+
+def _build_context(results: List[Dict[str, Any]], max_snippet_chars: int = DEFAULT_SNIPPET_CHARS) -> str:
+    """Build a compact, numbered context from retrieved results.
+
+    Descriptions are HTML-unescaped and cut to `max_snippet_chars` to cap input tokens.
+    """
+    docs: List[str] = []
+    for i, r in enumerate(results, start=1):
+        title = r.get("title") or "(no title)"
+        url = r.get("url") or "(no url)"
+        desc = html.unescape(r.get("description") or "")[:max_snippet_chars]
+        docs.append(DOC_TEMPLATE.format_map({"index": i, "title": title, "url": url, "description": desc}))
+    return "\n\n".join(docs)
+
 
-# Load environment variables from .env file
-load_dotenv()
+def _build_messages(query: str, context: str) -> List[Dict[str, str]]:
+    """Build the chat messages asking DeepSeek to answer `query` from `context`."""
+    user_prompt = USER_PROMPT_TEMPLATE.format_map({"query": query, "context": context})
+    return [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": user_prompt}]
 
-def rag_answer(query: str, max_results: int = 10, model: str = "deepseek-chat") -> Dict[str, Any]:
+
+def _write(text: str) -> None:
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def _stream_answer(chunks) -> str:
+    """Write streamed completion tokens to stdout as they arrive and return the full answer."""
+    buf: List[str] = []
+    for chunk in chunks:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            _write(delta)
+            buf.append(delta)
+    return "".join(buf).strip()
+
+
+def _no_key_result(query: str, results: List[Dict[str, Any]], context: str) -> Dict[str, Any]:
+    # Fallback: return aggregated snippets when no DeepSeek API key available
+    fallback_answer = (
+        "No DEEPSEEK_API_KEY set or `openai` package not found. Returning aggregated search snippets:\n\n"
+        + context
+    )
+    return {"query": query, "answer": fallback_answer, "sources": results, "context": context}
+
+
+def rag_answer(query: str, max_results: int = 10, model: str = "deepseek-chat",
+               use_cache: bool = True, cache_ttl: int = DEFAULT_TTL,
+               semantic_cache: bool = False, max_snippet_chars: int = DEFAULT_SNIPPET_CHARS,
+               stream: bool = False) -> Dict[str, Any]:
     """Perform a simple Retrieval-Augmented Generation using DuckDuckGo search results.
 
     If `DEEPSEEK_API_KEY` is set and `openai` is installed, the function will call DeepSeek's
      API to generate an answer using the retrieved documents. Otherwise
     it returns an aggregated fallback result built from titles and descriptions.
 
-    Returns a dict with keys: `query`, `answer`, `sources`.
+    Successful DeepSeek answers are cached on disk keyed by (query, max_results, model,
+    max_snippet_chars), so a repeated query returns immediately without searching or
+    calling the API.
+    With `semantic_cache`, a paraphrase of an earlier query (embedding similarity above
+    `rag_cache.SEMANTIC_THRESHOLD`) also reuses the earlier answer.
+
+    With `stream=True` the DeepSeek response is streamed and written to stdout token by
+    token; cached and fallback answers are written in one piece, so the caller never
+    needs to print `answer` itself.
+
+    Returns a dict with keys: `query`, `answer`, `sources`, `context`.
     """
-    results = search_duckduckgo(query, max_results=max_results)
+    load_env()
+    params = (max_results, model, max_snippet_chars)
+    key = cache_key(query, *params)
+    if use_cache:
+        cached = _cache_lookup(key, query, params, semantic_cache)
+        if cached is not None:
+            if stream:
+                _write(cached["answer"])
+            return cached
 
-    # Build a compact context from retrieved results
-    docs: List[str] = []
-    for i, r in enumerate(results, start=1):
-        title = r.get("title") or "(no title)"
-        url = r.get("url") or "(no url)"
-        desc = r.get("description") or ""
-        docs.append(f"[{i}] {title}\n{url}\n{desc}")
+    from search_ddg import search_duckduckgo
 
-    context = "\n\n".join(docs)
+    results = search_duckduckgo(query, max_results=max_results)
+    context = _build_context(results, max_snippet_chars)
 
-    # If DeepSeek API key is available and openai is installed, use it to generate an answer
+    # If DeepSeek API key is available, use it to generate an answer
     api_key = os.environ.get("DEEPSEEK_API_KEY")
-    if api_key and OpenAI is not None:
-        # Configure openai client to use DeepSeek API
-        client = OpenAI(
-            api_key=os.environ.get("DEEPSEEK_API_KEY"),
-            base_url="https://api.deepseek.com/v1")
-        
-        system = (
-            "You are a helpful assistant. Answer the user's question using only the content in provided"
-            " webpages from search results. Cite sources by their number in square brackets, e.g. [1]."
-        )
-        user_prompt = (
-            f"Question: {query}\n\nSearch results:\n{context}\n\n"
-            "Answer concisely and list which sources you used at the end."
-        )
-
-        # print("user_prompt:", user_prompt)
+    if api_key:
+        import httpx
+        from openai import APIError
+        from llm_client import get_client
 
         try:
-            resp = client.chat.completions.create(
+            resp = get_client().chat.completions.create(
                 model=model,
-                messages=[{"role": "system", "content": system}, {"role": "user", "content": user_prompt}],
+                messages=_build_messages(query, context),
                 max_tokens=512,
-                temperature=1,
-                timeout=60
+                temperature=0.5,
+                stream=stream
             )
-            answer = resp.choices[0].message.content.strip()
+            if stream:
+                answer = _stream_answer(resp)
+            else:
+                answer = resp.choices[0].message.content.strip()
             #print("DeepSeek API response:", answer)
-            return {"query": query, "answer": answer, "sources": results}
-        except Exception as e:
+            result = {"query": query, "answer": answer, "sources": results, "context": context}
+            if use_cache:
+                _cache_store(key, result, params, cache_ttl, semantic_cache)
+            return result
+        # Retries happen inside the client; httpx errors can surface unwrapped mid-stream
+        except (APIError, httpx.HTTPError) as e:
             fallback_answer = f"DeepSeek API error: {str(e)}\n\nFallback search results:\n{context}"
-            return {"query": query, "answer": fallback_answer, "sources": results}
+            if stream:
+                _write(fallback_answer)
+            return {"query": query, "answer": fallback_answer, "sources": results, "context": context}
 
-    # Fallback: return aggregated snippets when no DeepSeek API key available
-    fallback_answer = (
-        "No DEEPSEEK_API_KEY set or `openai` package not found. Returning aggregated search snippets:\n\n"
-        + context
+    result = _no_key_result(query, results, context)
+    if stream:
+        _write(result["answer"])
+    return result
+
+
+async def _complete_async(client: Any, model: str, query: str, context: str):
+    return await client.chat.completions.create(
+        model=model,
+        messages=_build_messages(query, context),
+        max_tokens=512,
+        temperature=0.5
     )
-    return {"query": query, "answer": fallback_answer, "sources": results}
+
+
+async def rag_answer_async(query: str, max_results: int = 10, model: str = "deepseek-chat",
+                           use_cache: bool = True, cache_ttl: int = DEFAULT_TTL,
+                           semantic_cache: bool = False,
+                           max_snippet_chars: int = DEFAULT_SNIPPET_CHARS,
+                           client: Any = None) -> Dict[str, Any]:
+    """Async variant of `rag_answer`.
+
+    The blocking DuckDuckGo search runs in a worker thread and the DeepSeek call goes through
+    `client` (an `AsyncOpenAI`), so many queries can be in flight at once. If `client` is
+    None, a client is created for this call and closed afterwards. Cache reads and writes
+    also run in worker threads, since the semantic cache embeds and saves to disk.
+    """
+    import asyncio
+
+    load_env()
+    params = (max_results, model, max_snippet_chars)
+    key = cache_key(query, *params)
+    if use_cache:
+        cached = await asyncio.to_thread(_cache_lookup, key, query, params, semantic_cache)
+        if cached is not None:
+            return cached
+
+    from search_ddg import search_duckduckgo
+
+    results = await asyncio.to_thread(search_duckduckgo, query, max_results=max_results)
+    context = _build_context(results, max_snippet_chars)
+
+    if not os.environ.get("DEEPSEEK_API_KEY"):
+        return _no_key_result(query, results, context)
+
+    import httpx
+    from openai import APIError
+    from llm_client import new_async_client
+
+    try:
+        if client is None:
+            async with new_async_client() as own_client:
+                resp = await _complete_async(own_client, model, query, context)
+        else:
+            resp = await _complete_async(client, model, query, context)
+        answer = resp.choices[0].message.content.strip()
+        result = {"query": query, "answer": answer, "sources": results, "context": context}
+        if use_cache:
+            await asyncio.to_thread(_cache_store, key, result, params, cache_ttl, semantic_cache)
+        return result
+    except (APIError, httpx.HTTPError) as e:
+        fallback_answer = f"DeepSeek API error: {str(e)}\n\nFallback search results:\n{context}"
+        return {"query": query, "answer": fallback_answer, "sources": results, "context": context}
+
+
+async def rag_answer_batch(queries: List[str], concurrency: int = 8, **kwargs: Any) -> List[Dict[str, Any]]:
+    """Answer several queries concurrently; wall-clock time is bounded by the slowest query.
+
+    At most `concurrency` queries are searched/generated at the same time. Results are
+    returned in the order of `queries`. Extra keyword arguments go to `rag_answer_async`.
+    A query that fails gets an error answer in its slot; the rest of the batch still completes.
+    All queries share one `AsyncOpenAI` client, which is closed when the batch finishes.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    import asyncio
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(q: str, client: Any) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await rag_answer_async(q, client=client, **kwargs)
+            except Exception as e:  # isolate failures so one query cannot sink the batch
+                return {"query": q, "answer": f"Error answering query: {str(e)}", "sources": [], "context": ""}
+
+    load_env()
+    if not os.environ.get("DEEPSEEK_API_KEY"):
+        # No client needed: every query falls back to aggregated snippets
+        return await asyncio.gather(*(_run(q, None) for q in queries))
+
+    from llm_client import new_async_client
+
+    async with new_async_client() as client:
+        return await asyncio.gather(*(_run(q, client) for q in queries))
 
 
 if __name__ == "__main__":
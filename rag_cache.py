@@ -0,0 +1,175 @@
+###Caches `rag_answer` results on disk so repeated queries skip search and generation.
+### `cache_key(query: str, *params) → str`
+### `get_cached(key: str) → Optional[Dict[str, Any]]`
+### `set_cached(key: str, result: Dict[str, Any], ttl: int = 86400) → None`
+### `get_semantic(query: str, *params) → Optional[Dict[str, Any]]`
+### `set_semantic(query: str, key: str, *params, ttl: int = 86400) → None`
+# **Parameters**:
+# - `query` (str): User query; normalized (stripped, lower-cased) before hashing
+# - `params`: Any further settings that change the answer (e.g. `max_results`, `model`)
+# - `key` (str): SHA-256 hex digest returned by `cache_key`
+# - `result` (dict): The `{query, answer, sources}` dict returned by `rag_answer`
+# - `ttl` (int): Seconds before the entry expires (default: 86400, one day)
+
+# **Notes**:
+# - Entries are stored as orjson-encoded bytes under `.rag_cache/` next to this file using `diskcache`.
+# - If `diskcache` is not installed, lookups always miss and stores are no-ops.
+# - The semantic layer embeds queries with `sentence-transformers` and reuses an answer when
+#   a previous query with the same `params` has cosine similarity above `SEMANTIC_THRESHOLD`.
+#   Its FAISS index is persisted to `.rag_cache/faiss.idx` and reloaded on first use; each row
+#   only records the exact-cache `key`, `params` and expiry, and the answer itself is read
+#   back from the exact-match cache. Expired rows are pruned when the index is loaded.
+#   If `sentence-transformers` or `faiss-cpu` is not installed, it is silently disabled;
+#   install them with `pip install -r requirements-semantic.txt`.
+##############################################################################
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+CACHE_DIR = Path(__file__).parent / ".rag_cache"
+DEFAULT_TTL = 86400
+
+SEMANTIC_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_THRESHOLD = 0.92
+SEMANTIC_CANDIDATES = 8
+_INDEX_PATH = CACHE_DIR / "faiss.idx"
+_ENTRIES_PATH = CACHE_DIR / "faiss_entries.json"
+
+_cache = None
+
+# Semantic cache state: FAISS row i corresponds to _entries[i]
+_encoder = None
+_index = None
+_entries: List[Dict[str, Any]] = []
+_semantic_lock = threading.Lock()
+
+
+def _get_cache():
+    """Open the on-disk cache on first use."""
+    global _cache
+    if _cache is None:
+        try:
+            from diskcache import Cache
+        except Exception:  # caching is optional; run uncached if diskcache is missing
+            return None
+        _cache = Cache(str(CACHE_DIR))
+    return _cache
+
+
+def cache_key(query: str, *params: Any) -> str:
+    """Build a stable key from the normalized query and the settings that affect the answer."""
+    parts = [query.strip().lower(), *(str(p) for p in params)]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def get_cached(key: str) -> Optional[Dict[str, Any]]:
+    """Return the stored result for `key`, or None on a miss or expired entry."""
+    cache = _get_cache()
+    if cache is None:
+        return None
+    raw = cache.get(key)
+    # Entries written before results were stored as orjson bytes come back as dicts
+    return orjson.loads(raw) if isinstance(raw, bytes) else raw
+
+
+def set_cached(key: str, result: Dict[str, Any], ttl: int = DEFAULT_TTL) -> None:
+    """Store `result` under `key` for `ttl` seconds."""
+    cache = _get_cache()
+    if cache is None:
+        return
+    cache.set(key, orjson.dumps(result), expire=ttl)
+
+
+def _write_atomic(path: Path, write) -> None:
+    """Write via `write(tmp_path)` then rename over `path`, so readers never see a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    write(str(tmp))
+    os.replace(tmp, path)
+
+
+def _save_semantic() -> None:
+    """Persist the FAISS index and its entry list."""
+    import faiss
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _write_atomic(_INDEX_PATH, lambda p: faiss.write_index(_index, p))
+    _write_atomic(_ENTRIES_PATH, lambda p: Path(p).write_bytes(orjson.dumps(_entries)))
+
+
+def _load_semantic() -> bool:
+    """Load the embedding model and FAISS index on first use. Returns False if unavailable."""
+    global _encoder, _index, _entries
+    if _index is not None:
+        return True
+    try:
+        import faiss
+        import numpy as np
+        from sentence_transformers import SentenceTransformer
+    except Exception:
+        return False
+
+    _encoder = SentenceTransformer(SEMANTIC_MODEL)
+    _index, _entries = None, []
+    if _INDEX_PATH.exists() and _ENTRIES_PATH.exists():
+        index = faiss.read_index(str(_INDEX_PATH))
+        entries = orjson.loads(_ENTRIES_PATH.read_bytes())
+        # A crash between the two writes leaves them out of step; start over in that case
+        if len(entries) == index.ntotal:
+            _index, _entries = index, entries
+
+    if _index is None:
+        _index = faiss.IndexFlatIP(_encoder.get_sentence_embedding_dimension())
+        return True
+
+    now = time.time()
+    expired = [i for i, entry in enumerate(_entries) if entry["expires"] <= now]
+    if expired:
+        # remove_ids keeps the remaining rows in order, matching the filtered entry list
+        _index.remove_ids(np.array(expired, dtype="int64"))
+        _entries = [entry for entry in _entries if entry["expires"] > now]
+        _save_semantic()
+    return True
+
+
+def _embed(query: str):
+    """Return an L2-normalized (1, dim) float32 embedding so inner product is cosine similarity."""
+    return _encoder.encode([query.strip()], normalize_embeddings=True).astype("float32")
+
+
+def get_semantic(query: str, *params: Any) -> Optional[Dict[str, Any]]:
+    """Return the result of a previous, similar query made with the same `params`, or None."""
+    wanted = [str(p) for p in params]
+    with _semantic_lock:
+        if not _load_semantic() or _index.ntotal == 0:
+            return None
+        scores, ids = _index.search(_embed(query), min(SEMANTIC_CANDIDATES, _index.ntotal))
+        now = time.time()
+        for score, idx in zip(scores[0], ids[0]):
+            if score < SEMANTIC_THRESHOLD:
+                break
+            entry = _entries[idx]
+            if entry["params"] == wanted and entry["expires"] > now:
+                result = get_cached(entry["key"])
+                if result is not None:
+                    return {**result, "query": query}
+    return None
+
+
+def set_semantic(query: str, key: str, *params: Any, ttl: int = DEFAULT_TTL) -> None:
+    """Add `query` to the semantic index, pointing at the exact-cache entry stored under `key`."""
+    with _semantic_lock:
+        if not _load_semantic():
+            return
+        _index.add(_embed(query))
+        _entries.append({
+            "key": key,
+            "params": [str(p) for p in params],
+            "expires": time.time() + ttl,
+        })
+        _save_semantic()
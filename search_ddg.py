@@ -10,6 +10,8 @@
 # - `title`: Page title
 # - `url`: Page URL
 # - `description`: Page snippet/description
+# Results without a URL, or whose URL repeats an earlier one (ignoring the fragment
+# and a trailing slash), are skipped.
 
 # **Raises**:
 # - `RuntimeError`: If `ddgs` library is not installed
@@ -17,11 +19,13 @@
 ###############################################################################
 import os   
 from typing import List, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
 
-try:
-    from ddgs import DDGS
-except Exception:  # keep import error visible at runtime if ddgs is missing
-    DDGS = None  # type: ignore
+
+def _normalize_url(url: str) -> str:
+    """Drop the fragment and any trailing slash so trivially different URLs compare equal."""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path.rstrip('/'), parts.query, ''))
 
 
 def search_duckduckgo(query: str, max_results: int = 10, safesearch: str = 'moderate', timelimit: str = 'm') -> List[Dict[str, Optional[str]]]:
@@ -33,7 +37,7 @@ def search_duckduckgo(query: str, max_results: int = 10, safesearch: str = 'mode
         safesearch: safesearch setting passed to ddgs (e.g. 'Off', 'Moderate', 'Strict').
 
     Returns:
-        A list of dict items with keys: 'title', 'url', 'description'.
+        A list of dict items with keys: 'title', 'url', 'description', with duplicate URLs removed.
 
     Raises:
         RuntimeError: If the `ddgs` library is not installed.
@@ -42,15 +46,24 @@ def search_duckduckgo(query: str, max_results: int = 10, safesearch: str = 'mode
     if not isinstance(query, str):
         raise TypeError("query must be a string")
 
-    if DDGS is None:
+    try:
+        from ddgs import DDGS  # deferred: ddgs is slow to import
+    except Exception:  # keep import error visible at runtime if ddgs is missing
         raise RuntimeError("ddgs library is not available. Install with 'pip install ddgs'")
 
     results: List[Dict[str, Optional[str]]] = []
+    seen = set()
 
     try:
         with DDGS() as ddgs:
             for item in ddgs.text(query, safesearch=safesearch, timelimit=timelimit):
                 url = item.get('link') or item.get('url') or item.get('href')
+                if not url:
+                    continue
+                key = _normalize_url(url)
+                if key in seen:
+                    continue
+                seen.add(key)
                 results.append({
                     'title': item.get('title'),
                     'url': url,